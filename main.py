@@ -1,6 +1,8 @@
 import streamlit as st
+from config import settings
 
-from streamlit_stackoverflow.data_handling import preprocess_data
+from streamlit_stackoverflow import api
+from streamlit_stackoverflow.data_handling import load_data
 from streamlit_stackoverflow.introduction import introduction_section
 from streamlit_stackoverflow.single_dimensional_analysis import (
     single_dimensional_section
@@ -12,8 +14,11 @@ from streamlit_stackoverflow.multi_dimensional_analysis import (
 
 def create_app() -> None:
     """Main function to create the whole app"""
+    if settings.api_enabled:
+        api.start_in_background()
+
     st.title("Trabalho Prático 2: Análise de dados do StackOverflow para 2021")
-    df = preprocess_data()
+    df = load_data()
 
     introduction_section(df)
     single_dimensional_section(df)
@@ -0,0 +1,234 @@
+"""Read-only JSON API with the aggregates shown in the app
+
+Run it on its own with ``python -m streamlit_stackoverflow.api`` or alongside
+the app by setting ``api_enabled``. Routes are ``/counts/<dimension>`` and
+``/salaries/<dimension>``, where the query string may filter rows by any
+dimension (``?Country=Brazil&Country=India``) and, for salaries, project the
+statistics returned (``?fields=n,median``).
+"""
+import json
+import logging
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+from config import settings
+
+from streamlit_stackoverflow.caching import memoize
+from streamlit_stackoverflow.data_handling import (
+    dataset_version, load_data, on_refresh, uses_python
+)
+from streamlit_stackoverflow.single_dimensional_analysis import (
+    add_group_sizes
+)
+
+
+DIMENSIONS = (
+    settings.COUNTRY,
+    settings.US_STATE,
+    settings.ED_LEVEL,
+    settings.AGE,
+    settings.EMPLOYMENT,
+    settings.ORG_SIZE,
+    settings.OP_SYS,
+    settings.MENTAL_HEALTH,
+    settings.USE_PYTHON,
+)
+SALARY_FIELDS = ("n", "mean", "std", "min", "q1", "median", "q3", "max")
+
+# Filters as (dimension, accepted values) pairs, sorted to be used as keys
+Filters = Tuple[Tuple[str, Tuple[str, ...]], ...]
+
+# Count groupings computed so far, the only ones worth folding
+_computed_counts: Set[Tuple[str, Filters]] = set()
+
+_server: Optional[ThreadingHTTPServer] = None
+_start_error: Optional[OSError] = None
+_lock = threading.Lock()
+
+logger = logging.getLogger(__name__)
+
+
+@memoize
+def aggregate(
+    df: pd.DataFrame,
+    kind: str,
+    by: str,
+    filters: Filters = (),
+    fields: Tuple[str, ...] = SALARY_FIELDS,
+) -> bytes:
+    """JSON body with the participant `counts` or `salaries` grouped `by`"""
+    if kind == "counts":
+        data = group_counts(df, by, filters).to_dict()
+    else:
+        df = _filtered(df, filters)
+        df = df[~df[settings.YEARLY_SALARY].isna()]
+        df_stats = (
+            df[settings.YEARLY_SALARY]
+            .groupby(_column(df, by))
+            .describe()
+            .set_axis(SALARY_FIELDS, axis=1)
+            .astype({"n": int})
+        )
+        df_stats = df_stats[list(fields)].astype(object)
+        data = df_stats.where(df_stats.notna(), None).to_dict(orient="index")
+
+    payload = {
+        "version": dataset_version(df),
+        "by": by,
+        "filters": {column: list(values) for column, values in filters},
+        "data": {str(key): value for key, value in data.items()},
+    }
+    return json.dumps(payload, separators=(",", ":")).encode()
+
+
+@memoize
+def group_counts(
+    df: pd.DataFrame, by: str, filters: Filters = ()
+) -> pd.Series:
+    """Participants per value of `by` among the rows passing `filters`"""
+    _computed_counts.add((by, filters))
+    df = _filtered(df, filters)
+    return df.groupby(_column(df, by)).size().sort_values()
+
+
+def serve(
+    host: Optional[str] = None, port: Optional[int] = None
+) -> ThreadingHTTPServer:
+    """Create the API server, not started yet"""
+    address = (
+        host or settings.api_host,
+        settings.api_port if port is None else port,
+    )
+    return ThreadingHTTPServer(address, _AggregatesHandler)
+
+
+def start_in_background() -> None:
+    """Start the API server in a daemon thread, only once per process
+
+    If the server can not be created, the error is logged and kept in
+    `_start_error` instead of raised, and later calls do not try again.
+    """
+    global _server, _start_error
+
+    with _lock:
+        if _server is not None or _start_error is not None:
+            return
+        try:
+            _server = serve()
+        except OSError as error:
+            # E.g. the port is taken by another replica; the app still runs
+            logger.exception("Could not start the aggregates API")
+            _start_error = error
+            return
+        threading.Thread(target=_server.serve_forever, daemon=True).start()
+
+
+def _column(df: pd.DataFrame, column: str) -> pd.Series:
+    """Column of `df`, always deriving whether participants use Python"""
+    if column == settings.USE_PYTHON:
+        return uses_python(df)
+    return df[column]
+
+
+def _filtered(df: pd.DataFrame, filters: Filters) -> pd.DataFrame:
+    """Rows of `df` with one of the accepted values for every filter"""
+    for column, values in filters:
+        df = df[_column(df, column).astype(str).isin(values)]
+    return df
+
+
+@on_refresh
+def _fold_new_rows(
+    df: pd.DataFrame, df_tail: pd.DataFrame, df_new: pd.DataFrame
+) -> None:
+    """Add the counts of the appended rows to the cached ones"""
+    for by, filters in list(_computed_counts):
+        cached = group_counts.peek(df, by, filters)
+        if cached is not None:
+            df_tail_rows = _filtered(df_tail, filters)
+            counts_tail = df_tail_rows.groupby(
+                _column(df_tail_rows, by)
+            ).size()
+            group_counts.put(
+                add_group_sizes(cached, counts_tail), df_new, by, filters
+            )
+
+
+def _parse_query(
+    kind: str, query: Dict[str, List[str]]
+) -> Tuple[Filters, Tuple[str, ...]]:
+    """Filters and projected fields, raising ValueError for unknown ones"""
+    fields = SALARY_FIELDS
+    if "fields" in query:
+        if kind != "salaries":
+            raise ValueError("fields are only available for salaries")
+        fields = tuple(",".join(query.pop("fields")).split(","))
+        unknown = set(fields) - set(SALARY_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+
+    unknown = set(query) - set(DIMENSIONS)
+    if unknown:
+        raise ValueError(f"Unknown filters: {', '.join(sorted(unknown))}")
+    filters = tuple(
+        (column, tuple(sorted(values))) for column, values in query.items()
+    )
+    return tuple(sorted(filters)), fields
+
+
+class _AggregatesHandler(BaseHTTPRequestHandler):
+    """Serve the aggregates, answering conditional GETs with ETags"""
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        route = url.path.strip("/").split("/")
+        if (
+            len(route) != 2
+            or route[0] not in ("counts", "salaries")
+            or route[1] not in DIMENSIONS
+        ):
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        kind, by = route
+
+        try:
+            filters, fields = _parse_query(kind, parse_qs(url.query))
+        except ValueError as error:
+            self.send_error(HTTPStatus.BAD_REQUEST, str(error))
+            return
+
+        df = load_data()
+        etag = f'"{dataset_version(df)}"'
+        if_none_match = [
+            tag.strip()
+            for tag in self.headers.get("If-None-Match", "").split(",")
+        ]
+        if etag in if_none_match or "*" in if_none_match:
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        body = aggregate(df, kind, by, filters, fields)
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
+
+if __name__ == "__main__":
+    from streamlit_stackoverflow.warmup import warm_up
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    warm_up()
+    server = serve()
+    print(f"Serving aggregates on http://{server.server_address[0]}:"
+          f"{server.server_address[1]}")
+    server.serve_forever()
@@ -0,0 +1,206 @@
+"""Memoization of computations keyed by the dataset version"""
+import functools
+import inspect
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+from config import settings
+
+from streamlit_stackoverflow.data_handling import frame_token
+
+
+class CacheInfo(NamedTuple):
+    """Statistics of a memoized function, or of all of them"""
+
+    hits: int
+    misses: int
+    entries: int
+    size: int  # bytes
+
+
+class _Entry(NamedTuple):
+    value: Any
+    size: int
+    version: Hashable
+
+
+# Entries of all memoized functions, least recently used first
+_entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+_counters: Dict[str, Dict[str, int]] = {}
+_total_size = 0
+_lock = threading.RLock()
+
+
+def memoize(func: Callable) -> Callable:
+    """Cache the results of `func(df, ...)` for each version of the data
+
+    The key is the cheap token of the frame given as first argument (see
+    `frame_token`) plus the remaining arguments, which must be hashable once
+    lists are turned into tuples. The frame itself is never hashed. Frames
+    without a dataset version are not cached.
+
+    As the token only tells rows apart, `df` must be a subset of the rows of
+    a versioned frame, optionally with columns derived deterministically
+    from it (e.g. `df.assign(...)` of a function of its columns). Frames with
+    the same rows but other values share every entry.
+
+    Results are returned by reference and must not be modified by callers.
+    NumPy arrays in them are made read-only when cached; copy Series and
+    frames before changing them, e.g. `drop` instead of `pop`.
+
+    All memoized functions share the memory budget `cache_max_bytes`, evicting
+    the least recently used entries when it is exceeded. The decorated
+    function gains `cache_info`, `peek` and `put` attributes.
+    """
+    name = f"{func.__module__}.{func.__qualname__}"
+    signature = inspect.signature(func)
+    _counters[name] = {"hits": 0, "misses": 0}
+
+    def make_key(df: pd.DataFrame, *args, **kwargs) -> Optional[Hashable]:
+        token = frame_token(df)
+        if token is None:
+            return None
+
+        bound = signature.bind(df, *args, **kwargs)
+        bound.apply_defaults()
+        arguments = tuple(
+            (arg_name, _hashable(value))
+            for arg_name, value in list(bound.arguments.items())[1:]
+        )
+        return (name, token, arguments)
+
+    @functools.wraps(func)
+    def wrapper(df: pd.DataFrame, *args, **kwargs):
+        key = make_key(df, *args, **kwargs)
+        with _lock:
+            if key is not None and key in _entries:
+                _entries.move_to_end(key)
+                _counters[name]["hits"] += 1
+                return _entries[key].value
+            _counters[name]["misses"] += 1
+
+        value = func(df, *args, **kwargs)
+        if key is not None:
+            _store(key, value)
+        return value
+
+    def peek(df: pd.DataFrame, *args, **kwargs) -> Optional[Any]:
+        """Cached result for these arguments, without computing it"""
+        key = make_key(df, *args, **kwargs)
+        with _lock:
+            entry = _entries.get(key)
+        return None if entry is None else entry.value
+
+    def put(value: Any, df: pd.DataFrame, *args, **kwargs) -> None:
+        """Cache `value` as the result for these arguments
+
+        Entries of other versions are kept, so refresh hooks running after
+        this one can still fold their own results of the previous version.
+        """
+        key = make_key(df, *args, **kwargs)
+        if key is not None:
+            _store(key, value, drop_stale=False)
+
+    def info() -> CacheInfo:
+        """Statistics of this function"""
+        with _lock:
+            own = [entry for key, entry in _entries.items() if key[0] == name]
+            return CacheInfo(
+                hits=_counters[name]["hits"],
+                misses=_counters[name]["misses"],
+                entries=len(own),
+                size=sum(entry.size for entry in own),
+            )
+
+    wrapper.cache_info = info
+    wrapper.peek = peek
+    wrapper.put = put
+    return wrapper
+
+
+def cache_info() -> CacheInfo:
+    """Statistics of all memoized functions together"""
+    with _lock:
+        return CacheInfo(
+            hits=sum(counter["hits"] for counter in _counters.values()),
+            misses=sum(counter["misses"] for counter in _counters.values()),
+            entries=len(_entries),
+            size=_total_size,
+        )
+
+
+def clear_cache() -> None:
+    """Drop every cached result and reset the counters"""
+    global _total_size
+
+    with _lock:
+        _entries.clear()
+        _total_size = 0
+        for counter in _counters.values():
+            counter["hits"] = counter["misses"] = 0
+
+
+def _store(key: Hashable, value: Any, drop_stale: bool = True) -> None:
+    """Cache `value`, evicting old versions and least recently used entries"""
+    global _total_size
+
+    version = key[1][0]
+    size = _size_of(value)
+    if size > settings.cache_max_bytes:
+        return
+
+    with _lock:
+        # Entries from older versions of the data will never be hit again
+        stale = []
+        if drop_stale:
+            stale = [k for k, e in _entries.items() if e.version != version]
+        for old_key in stale + ([key] if key in _entries else []):
+            _total_size -= _entries.pop(old_key).size
+
+        while _entries and _total_size + size > settings.cache_max_bytes:
+            _, evicted = _entries.popitem(last=False)
+            _total_size -= evicted.size
+
+        _freeze(value)
+        _entries[key] = _Entry(value, size, version)
+        _total_size += size
+
+
+def _freeze(value: Any) -> None:
+    """Make the NumPy arrays in a cached result read-only"""
+    if isinstance(value, np.ndarray):
+        value.setflags(write=False)
+    elif isinstance(value, (tuple, list)):
+        for item in value:
+            _freeze(item)
+    elif isinstance(value, dict):
+        for item in value.values():
+            _freeze(item)
+
+
+def _hashable(value: Any) -> Hashable:
+    """Turn lists, which are common for `by` arguments, into tuples"""
+    if isinstance(value, list):
+        return tuple(_hashable(item) for item in value)
+    return value
+
+
+def _size_of(value: Any) -> int:
+    """Approximate memory used by a cached result, in bytes"""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return int(np.sum(value.memory_usage(deep=True, index=True)))
+    if isinstance(value, pd.Index):
+        return value.memory_usage(deep=True)
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(_size_of(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            _size_of(key) + _size_of(item) for key, item in value.items()
+        )
+    return sys.getsizeof(value)
@@ -1,12 +1,188 @@
 """Preprocess data before presenting it"""
+import hashlib
+import io
+import os
+import threading
+from typing import Callable, Hashable, List, Optional
+
 import pandas as pd
 from config import settings
 
 
+# Key in `DataFrame.attrs` holding the version of the loaded dataset
+DATASET_VERSION = "dataset_version"
+# Key in `DataFrame.attrs` describing how much of the data file was read
+DATA_SOURCE = "data_source"
+
+# Bytes before the end of the read data hashed to detect a rewritten file
+_FINGERPRINT_BYTES = 4096
+
+RefreshHook = Callable[[pd.DataFrame, pd.DataFrame, pd.DataFrame], None]
+_refresh_hooks: List[RefreshHook] = []
+
+# Data served by `load_data`, shared among all sessions of the app
+_loaded: Optional[pd.DataFrame] = None
+_lock = threading.Lock()
+
+
+def load_data() -> pd.DataFrame:
+    """Data for the app, refreshed with the rows appended since last call
+
+    The same frame is shared by all sessions and the API, so callers must
+    treat it as read-only: derive new columns on a copy, e.g. with `assign`.
+    """
+    global _loaded
+
+    with _lock:
+        if _loaded is None or not settings.data_incremental_refresh:
+            _loaded = preprocess_data()
+        else:
+            _loaded = refresh_data(_loaded)
+        return _loaded
+
+
 def preprocess_data() -> pd.DataFrame:
     """Remove NaN and other important stuff"""
-    df = pd.read_csv(settings.data_file)
+    with open(settings.data_file, "rb") as data_file:
+        content = data_file.read()
+        growing = os.fstat(data_file.fileno()).st_size > len(content)
+
+    num_columns = pd.read_csv(io.BytesIO(content), nrows=0).columns.size
+    offset = _complete_length(content, num_columns, growing)
+    df = pd.read_csv(io.BytesIO(content[:offset]))
+    # Types as parsed, before cleaning, to read appended rows the same way
+    dtypes = {
+        column: str if dtype == object else dtype.name
+        for column, dtype in df.dtypes.items()
+    }
+    _clean_data(df)
+
+    df.attrs[DATA_SOURCE] = {
+        "columns": list(df.columns),
+        "dtypes": dtypes,
+        "offset": offset,
+        "fingerprint": _fingerprint(content[:offset]),
+    }
+    df.attrs[DATASET_VERSION] = _version(df)
+
+    return df
+
+
+def refresh_data(df: pd.DataFrame) -> pd.DataFrame:
+    """Fold the rows appended to the data file since `df` was read
+
+    Only the new tail of the file is parsed and cleaned, with the same types
+    as `df`, so the result equals loading the whole file again. If nothing was
+    appended `df` itself is returned, and if the file was rewritten instead of
+    appended to, or the new values do not fit the column types, it is loaded
+    from scratch. Functions registered with
+    `on_refresh` are called to fold the tail into their precomputed results.
+    """
+    source = df.attrs[DATA_SOURCE]
+    offset = source["offset"]
+    start = max(0, offset - _FINGERPRINT_BYTES)
+
+    with open(settings.data_file, "rb") as data_file:
+        data_file.seek(start)
+        content = data_file.read()
+        growing = os.fstat(data_file.fileno()).st_size > start + len(content)
+
+    read_before = content[:offset - start]
+    if (
+        len(read_before) < offset - start
+        or _fingerprint(read_before) != source["fingerprint"]
+    ):
+        return preprocess_data()
+
+    tail = content[offset - start:]
+    tail = tail[:_complete_length(tail, len(source["columns"]), growing)]
+    if not tail.strip():
+        return df
+
+    try:
+        df_tail = pd.read_csv(
+            io.BytesIO(tail),
+            header=None,
+            names=source["columns"],
+            dtype=source["dtypes"],
+        )
+    except ValueError:
+        # New values do not fit a column type, e.g. text in a numeric column
+        return preprocess_data()
+    df_tail.index = pd.RangeIndex(len(df), len(df) + len(df_tail))
+    _clean_data(df_tail)
+
+    df_new = pd.concat([df, df_tail])
+    df_new.attrs[DATA_SOURCE] = {
+        "columns": source["columns"],
+        "dtypes": source["dtypes"],
+        "offset": offset + len(tail),
+        "fingerprint": _fingerprint(read_before + tail),
+    }
+    df_new.attrs[DATASET_VERSION] = _version(df_new)
+
+    for hook in _refresh_hooks:
+        hook(df, df_tail, df_new)
+
+    return df_new
+
+
+def on_refresh(hook: RefreshHook) -> RefreshHook:
+    """Register `hook(df_old, df_tail, df_new)` to run on each refresh"""
+    _refresh_hooks.append(hook)
+    return hook
 
+
+def dataset_version(df: pd.DataFrame) -> Optional[str]:
+    """Version of the dataset `df` was derived from, if known
+
+    Pandas propagates `attrs` to slices and filtered copies, so subsets of the
+    frame returned by `preprocess_data` keep the same version.
+    """
+    return df.attrs.get(DATASET_VERSION)
+
+
+def frame_token(df: pd.DataFrame) -> Optional[Hashable]:
+    """Cheap key identifying the rows of `df`, or None if version is unknown
+
+    Subsets share the version of the full data, so they are told apart by the
+    number and hash of their index labels instead of hashing their contents.
+    Columns are ignored: frames with the same rows get the same token.
+    """
+    version = dataset_version(df)
+    if version is None:
+        return None
+
+    rows = pd.util.hash_array(df.index.to_numpy()).sum()
+    return (version, len(df), rows)
+
+
+def uses_python(df: pd.DataFrame) -> pd.Series:
+    """Whether each participant works with Python
+
+    Sections derive it instead of storing it in the shared frame, which
+    `load_data` hands to every session and must not be written to.
+    """
+    return df[settings.USED_LANGUAGES].str.contains("Python")
+
+
+def salary_rows(df: pd.DataFrame) -> pd.DataFrame:
+    """Participants who informed their yearly salary"""
+    return df[~df[settings.YEARLY_SALARY].isna()]
+
+
+def full_time_rows(df: pd.DataFrame) -> pd.DataFrame:
+    """Participants employed full-time"""
+    return df[df[settings.EMPLOYMENT] == settings.EMPLOYED_FULL_TIME]
+
+
+def python_rows(df: pd.DataFrame) -> pd.DataFrame:
+    """Participants who work with Python"""
+    return df[uses_python(df)]
+
+
+def _clean_data(df: pd.DataFrame) -> None:
+    """Apply the NaN rules to every column that needs them"""
     _override_nas(df, column=settings.ED_LEVEL)
     _override_nas(df, column=settings.AGE)
     _override_nas(df, column=settings.YEARS_CODE)
@@ -19,7 +195,38 @@ def preprocess_data() -> pd.DataFrame:
     _override_nas(df, column=settings.ORG_SIZE)
     _override_nas(df, column=settings.OP_SYS)
 
-    return df
+
+def _complete_length(content: bytes, num_columns: int, growing: bool) -> int:
+    """Length of the complete rows at the start of `content`
+
+    A last line without a newline is kept if it has every column, as files do
+    not need to end with one. It is left for the next refresh if it does not
+    parse, has fewer columns or the file grew while read, as it is probably
+    still being written.
+    """
+    length = content.rfind(b"\n") + 1
+    last_line = content[length:]
+    if growing or not last_line.strip():
+        return length
+
+    try:
+        row = pd.read_csv(io.BytesIO(last_line), header=None, dtype=str)
+    except pd.errors.ParserError:
+        return length
+    return len(content) if row.columns.size == num_columns else length
+
+
+def _fingerprint(content: bytes) -> str:
+    """Hash of the last bytes of the data read so far"""
+    return hashlib.blake2b(
+        content[-_FINGERPRINT_BYTES:], digest_size=8
+    ).hexdigest()
+
+
+def _version(df: pd.DataFrame) -> str:
+    """Version built from the row count and the position read in the file"""
+    source = df.attrs[DATA_SOURCE]
+    return f"{len(df):x}-{source['offset']:x}-{source['fingerprint']}"
 
 
 def _override_nas(df: pd.DataFrame, column: str) -> pd.DataFrame:
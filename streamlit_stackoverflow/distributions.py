@@ -0,0 +1,102 @@
+"""Log-binned salary histograms for every group of a dimension"""
+from typing import NamedTuple, Optional, Set
+
+import numpy as np
+import pandas as pd
+from config import settings
+
+from streamlit_stackoverflow.caching import memoize
+from streamlit_stackoverflow.data_handling import on_refresh, uses_python
+
+
+# Dimensions with histograms computed so far, the only ones worth folding
+_computed_bys: Set[str] = set()
+
+
+class SalaryHistogram(NamedTuple):
+    """Salary counts per group (rows) and logarithmic bin (columns)"""
+
+    groups: pd.Index
+    edges: np.ndarray
+    counts: np.ndarray
+
+    def merge(self, other: "SalaryHistogram") -> "SalaryHistogram":
+        """Histogram of the data of both histograms, e.g. of two chunks"""
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError("Histograms with different bins can not merge")
+
+        groups = self.groups.union(other.groups)
+        counts = np.zeros((groups.size, self.edges.size - 1), dtype=np.int64)
+        counts[groups.get_indexer(self.groups)] += self.counts
+        counts[groups.get_indexer(other.groups)] += other.counts
+        return SalaryHistogram(groups, self.edges, counts)
+
+    def top_k(self, k: Optional[int]) -> "SalaryHistogram":
+        """Keep the `k` largest groups, summing the others in an "other" one
+
+        Like `top_k` for group sizes, the other group comes first and a `k` of
+        None keeps every group.
+        """
+        if k is None or self.groups.size <= k:
+            return self
+
+        kept = np.sort(np.argsort(self.counts.sum(axis=1), kind="stable")[-k:])
+        is_kept = np.zeros(self.groups.size, dtype=bool)
+        is_kept[kept] = True
+        groups = pd.Index(
+            [settings.other_label, *self.groups[is_kept].astype(str)]
+        )
+        counts = np.vstack(
+            [self.counts[~is_kept].sum(axis=0), self.counts[is_kept]]
+        )
+        return SalaryHistogram(groups, self.edges, counts)
+
+
+def salary_edges() -> np.ndarray:
+    """Log-spaced bin edges shared by every histogram, so they can merge"""
+    return np.logspace(
+        np.log10(settings.histogram_min_salary),
+        np.log10(settings.histogram_max_salary),
+        settings.histogram_bins + 1,
+    )
+
+
+@memoize
+def salary_histogram(df: pd.DataFrame, by: str) -> SalaryHistogram:
+    """Histogram of yearly salaries for all groups of `by` at once
+
+    Each salary gets a single (group, bin) index and all of them are counted
+    by one `np.bincount`. Salaries outside the edges go to the first or last
+    bin, and rows missing the salary or group are ignored. Whether people use
+    Python is derived from their languages, so that `by` can be refreshed
+    too. Results are cached per dataset version.
+    """
+    _computed_bys.add(by)
+    column = uses_python(df) if by == settings.USE_PYTHON else df[by]
+    is_kept = ~df[settings.YEARLY_SALARY].isna() & ~column.isna()
+    codes, groups = pd.factorize(column[is_kept], sort=True)
+    edges = salary_edges()
+    num_bins = edges.size - 1
+
+    bins = np.searchsorted(
+        edges, df.loc[is_kept, settings.YEARLY_SALARY].to_numpy(), side="right"
+    )
+    bins = np.clip(bins - 1, 0, num_bins - 1)
+    counts = np.bincount(
+        codes * num_bins + bins, minlength=groups.size * num_bins
+    )
+    return SalaryHistogram(
+        pd.Index(groups, name=by), edges, counts.reshape(-1, num_bins)
+    )
+
+
+@on_refresh
+def _fold_new_rows(
+    df: pd.DataFrame, df_tail: pd.DataFrame, df_new: pd.DataFrame
+) -> None:
+    """Merge the histograms of the appended rows into the cached ones"""
+    for by in list(_computed_bys):
+        cached = salary_histogram.peek(df, by=by)
+        if cached is not None:
+            tail_histogram = salary_histogram(df_tail, by=by)
+            salary_histogram.put(cached.merge(tail_histogram), df_new, by=by)
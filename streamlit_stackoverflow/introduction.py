@@ -1,8 +1,19 @@
 """An overview of the data"""
+from typing import Dict, List, Optional
+
+import numpy as np
 import pandas as pd
 import streamlit as st
 from config import settings
 
+from streamlit_stackoverflow.caching import memoize
+
+
+NO_SORTING = "Sem ordenação"
+NO_FILTER = "Sem filtro"
+# Columns with more values than this are filtered by typing the value
+MAX_FILTER_OPTIONS = 1000
+
 
 def introduction_section(df: pd.DataFrame) -> None:
     """Shows introduction section information"""
@@ -15,12 +26,12 @@ def introduction_section(df: pd.DataFrame) -> None:
         """
     )
 
-    # The whole data is too large, so show a portion of it
+    # The whole data is too large, so show it one page at a time
     if st.checkbox(
-        "Clique aqui para ver uma amostra dos dados brutos",
+        "Clique aqui para ver os dados brutos",
         value=False,
     ):
-        st.dataframe(df[:settings.data_max_rows_display])
+        _raw_data_browser(df)
 
     st.markdown("Aqui está um breve resumo dos dados:")
     st.markdown(
@@ -29,3 +40,110 @@ def introduction_section(df: pd.DataFrame) -> None:
         - Quantidade de colunas: {df.columns.size}
         """
     )
+
+
+def _raw_data_browser(df: pd.DataFrame) -> None:
+    """Browse the raw data page by page, sending only the visible cells"""
+    columns = st.multiselect(
+        "Colunas exibidas", list(df.columns), default=list(df.columns)
+    )
+
+    sort_by = st.selectbox("Ordenar pela coluna", [NO_SORTING, *df.columns])
+    descending = st.checkbox("Ordem decrescente", value=False)
+
+    filter_by = st.selectbox("Filtrar pela coluna", [NO_FILTER, *df.columns])
+    filter_value = None
+    if filter_by != NO_FILTER:
+        values = list(value_positions(df, filter_by))
+        if len(values) <= MAX_FILTER_OPTIONS:
+            filter_value = st.selectbox("Valor", values)
+        else:
+            filter_value = st.text_input("Valor")
+
+    num_rows = len(df)
+    if filter_value is not None:
+        num_rows = len(value_positions(df, filter_by).get(filter_value, []))
+    num_pages = max(1, -(-num_rows // settings.data_max_rows_display))
+    page = st.number_input(
+        f"Página (de {num_pages})", min_value=1, max_value=num_pages, value=1
+    )
+
+    df_page = raw_data_page(
+        df,
+        page=page - 1,
+        columns=columns,
+        sort_by=None if sort_by == NO_SORTING else sort_by,
+        descending=descending,
+        filter_by=None if filter_by == NO_FILTER else filter_by,
+        filter_value=filter_value,
+    )
+    st.dataframe(df_page)
+    st.caption(f"{num_rows} registros encontrados")
+
+
+def raw_data_page(
+    df: pd.DataFrame,
+    page: int,
+    columns: List[str],
+    sort_by: Optional[str] = None,
+    descending: bool = False,
+    filter_by: Optional[str] = None,
+    filter_value: Optional[str] = None,
+    page_size: Optional[int] = None,
+) -> pd.DataFrame:
+    """Rows of the 0-based `page`, projected to only `columns`
+
+    Rows are `filter_by == filter_value`, compared as strings, ordered by
+    `sort_by`. Without sorting nor filtering the page is a slice of `df`.
+    """
+    page_size = page_size or settings.data_max_rows_display
+    start, stop = page * page_size, (page + 1) * page_size
+    column_positions = df.columns.get_indexer(columns)
+
+    if sort_by is None and filter_by is None:
+        return df.iloc[start:stop, column_positions]
+
+    rows = _matching_rows(df, sort_by, descending, filter_by, filter_value)
+    return df.iloc[rows[start:stop], column_positions]
+
+
+@memoize
+def sort_order(df: pd.DataFrame, by: str, descending: bool) -> np.ndarray:
+    """Positions of the rows of `df` sorted `by`, missing values last"""
+    return (
+        df[by]
+        .reset_index(drop=True)
+        .sort_values(ascending=not descending, kind="stable")
+        .index.to_numpy()
+    )
+
+
+@memoize
+def value_positions(df: pd.DataFrame, by: str) -> Dict[str, np.ndarray]:
+    """Positions of the rows of `df` for each value of `by`, as string"""
+    return df.groupby(df[by].astype(str).to_numpy(), sort=True).indices
+
+
+def _matching_rows(
+    df: pd.DataFrame,
+    sort_by: Optional[str],
+    descending: bool,
+    filter_by: Optional[str],
+    filter_value: Optional[str],
+) -> np.ndarray:
+    """Positions of the rows that pass the filter, in the sorted order
+
+    At least one of `sort_by` and `filter_by` must be given.
+    """
+    if filter_by is not None:
+        rows = value_positions(df, filter_by).get(
+            filter_value, np.array([], dtype=np.intp)
+        )
+        if sort_by is None:
+            return rows
+        is_kept = np.zeros(len(df), dtype=bool)
+        is_kept[rows] = True
+        order = sort_order(df, sort_by, descending)
+        return order[is_kept[order]]
+
+    return sort_order(df, sort_by, descending)
@@ -0,0 +1,124 @@
+"""Co-occurrence and migration of programming languages"""
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from config import settings
+
+from streamlit_stackoverflow.caching import memoize
+from streamlit_stackoverflow.data_handling import on_refresh
+
+
+def language_cooccurrence(
+    df: pd.DataFrame, mask: Optional[pd.Series] = None
+) -> pd.DataFrame:
+    """Number of participants that worked with each pair of languages
+
+    The diagonal holds how many participants worked with each language. Only
+    the rows selected by the boolean `mask`, if given, are counted.
+    """
+    used, _, languages = _masked_matrices(df, mask)
+    counts = used.T @ used
+    return pd.DataFrame(counts.astype(int), index=languages, columns=languages)
+
+
+def language_migration(
+    df: pd.DataFrame, mask: Optional[pd.Series] = None
+) -> pd.DataFrame:
+    """Number of participants that worked with a language and want another
+
+    Rows are the languages worked with and columns the desired ones. Only
+    the rows selected by the boolean `mask`, if given, are counted.
+    """
+    used, desired, languages = _masked_matrices(df, mask)
+    counts = used.T @ desired
+    return pd.DataFrame(counts.astype(int), index=languages, columns=languages)
+
+
+@memoize
+def language_matrices(
+    df: pd.DataFrame,
+) -> Tuple[np.ndarray, np.ndarray, pd.Index]:
+    """Participant x language indicators of used and desired languages
+
+    Both matrices share the same language columns, returned as the last item.
+    Results are cached per dataset version.
+    """
+    used = _explode_languages(df[settings.USED_LANGUAGES])
+    desired = _explode_languages(df[settings.DESIRED_LANGUAGES])
+    languages = pd.Index(pd.concat([used, desired]).unique()).sort_values()
+
+    return (
+        _indicator_matrix(used, len(df), languages),
+        _indicator_matrix(desired, len(df), languages),
+        languages,
+    )
+
+
+@on_refresh
+def _fold_new_rows(
+    df: pd.DataFrame, df_tail: pd.DataFrame, df_new: pd.DataFrame
+) -> None:
+    """Extend the cached matrices of `df` with the rows appended to it"""
+    cached = language_matrices.peek(df)
+    if cached is None:
+        return
+
+    used, desired, languages = cached
+    used_tail = _explode_languages(df_tail[settings.USED_LANGUAGES])
+    desired_tail = _explode_languages(df_tail[settings.DESIRED_LANGUAGES])
+    new_languages = languages.union(
+        pd.concat([used_tail, desired_tail]).unique()
+    )
+
+    # Languages seen for the first time get new, empty columns
+    columns = new_languages.get_indexer(languages)
+    matrices = []
+    for matrix, exploded in ((used, used_tail), (desired, desired_tail)):
+        matrix_new = np.zeros(
+            (matrix.shape[0] + len(df_tail), new_languages.size),
+            dtype=matrix.dtype,
+        )
+        matrix_new[:matrix.shape[0], columns] = matrix
+        matrix_new[matrix.shape[0]:] = _indicator_matrix(
+            exploded, len(df_tail), new_languages
+        )
+        matrices.append(matrix_new)
+
+    language_matrices.put((*matrices, new_languages), df_new)
+
+
+def _masked_matrices(
+    df: pd.DataFrame, mask: Optional[pd.Series]
+) -> Tuple[np.ndarray, np.ndarray, pd.Index]:
+    """Indicator matrices restricted to the rows selected by `mask`"""
+    used, desired, languages = language_matrices(df)
+    if mask is not None:
+        rows = mask.reindex(df.index, fill_value=False).to_numpy(dtype=bool)
+        used, desired = used[rows], desired[rows]
+    return used, desired, languages
+
+
+def _explode_languages(series: pd.Series) -> pd.Series:
+    """One language per entry, indexed by the position of its participant"""
+    unavailable = series == settings.default_str_nan
+    exploded = (
+        series.mask(unavailable)
+        .reset_index(drop=True)
+        .str.split(";")
+        .explode()
+    )
+    return exploded[exploded.notna() & (exploded != "")]
+
+
+def _indicator_matrix(
+    exploded: pd.Series, num_rows: int, languages: pd.Index
+) -> np.ndarray:
+    """Matrix with a 1 where the participant in each row lists the language
+
+    Built with a single scatter of (participant, language) positions instead
+    of looping over participants.
+    """
+    matrix = np.zeros((num_rows, languages.size), dtype=np.float32)
+    matrix[exploded.index.to_numpy(), languages.get_indexer(exploded)] = 1
+    return matrix
@@ -1,11 +1,18 @@
+from typing import Callable, Optional
+
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 import streamlit as st
 from config import settings
 
+from streamlit_stackoverflow.data_handling import (
+    full_time_rows, python_rows, salary_rows, uses_python
+)
+from streamlit_stackoverflow.distributions import salary_histogram
+from streamlit_stackoverflow.resampling import Grouping, compare_salary_medians
 from streamlit_stackoverflow.single_dimensional_analysis import (
-    bar_plot, pie_plot
+    bar_plot, group_sizes, pie_plot, reduce_font_size, top_k_to_show
 )
 
 
@@ -32,11 +39,12 @@ def _salary_analyses(df_raw: pd.DataFrame) -> None:
     st.subheader("Salário anual convertido")
 
     # Remove NaN salaries as they are useless to us
-    df = df_raw[~df_raw[settings.YEARLY_SALARY].isna()]
+    df = salary_rows(df_raw)
     _salary_age(df)
     _salary_edlevel(df)
     _salary_country(df)
     _salary_mentalhealth(df)
+    _salary_distributions(df_raw)
 
 
 def _salary_age(df: pd.DataFrame) -> None:
@@ -55,9 +63,7 @@ def _salary_age(df: pd.DataFrame) -> None:
         """
     )
 
-    ax = df.boxplot(column=settings.YEARLY_SALARY, by=settings.AGE, rot=90)
-    ax.set_title("Salário por faixa de idade")
-    st.pyplot(ax.get_figure())
+    _salary_box_plot(df, by=settings.AGE, title="Salário por faixa de idade")
 
     st.markdown(
         """
@@ -70,14 +76,12 @@ def _salary_age(df: pd.DataFrame) -> None:
         """
     )
 
-    ax2 = df.boxplot(
-        column=settings.YEARLY_SALARY,
+    _salary_box_plot(
+        df,
         by=settings.AGE,
-        rot=90,
+        title="Salário por faixa de idade sem outliers",
         showfliers=False,
     )
-    ax2.set_title("Salário por faixa de idade sem outliers")
-    st.pyplot(ax2.get_figure())
 
 
 def _salary_edlevel(df: pd.DataFrame) -> None:
@@ -90,30 +94,30 @@ def _salary_edlevel(df: pd.DataFrame) -> None:
         de escolaridade. De todo modo, para evitar conclusões errôneas, o
         próximo gráfico mostra as mesmas informações sem os outliers.
 
-        É possível observar que, dada a grande variabilidade em todos os
-        grupos, não parece haver diferença significativa em nenhum deles. Ou
-        seja, o salário típico não depende dos níveis de escolaridade
-        dos participantes. Talvez a própria existência do StackOverflow seja
-        suficiente para explicar isso: grande parte da informação necessária
-        para aprender e a tirar dúvidas encontra-se disponível, e assim as
-        barreiras para entrar na área são fortemente reduzidas.
+        Dada a grande variabilidade em todos os grupos, as diferenças entre
+        eles parecem pequenas. A tabela após os gráficos compara as medianas
+        com seus intervalos de confiança e um teste de hipóteses. Se o teste
+        não indicar diferença significativa, o salário típico não depende dos
+        níveis de escolaridade dos participantes. Talvez a própria existência
+        do StackOverflow seja suficiente para explicar isso: grande parte da
+        informação necessária para aprender e a tirar dúvidas encontra-se
+        disponível, e assim as barreiras para entrar na área são fortemente
+        reduzidas.
         """
     )
 
-    ax = df.boxplot(
-        column=settings.YEARLY_SALARY, by=settings.ED_LEVEL, rot=90
+    _salary_box_plot(
+        df, by=settings.ED_LEVEL, title="Salário por escolaridade"
     )
-    ax.set_title("Salário por escolaridade")
-    st.pyplot(ax.get_figure())
 
-    ax2 = df.boxplot(
-        column=settings.YEARLY_SALARY,
+    _salary_box_plot(
+        df,
         by=settings.ED_LEVEL,
-        rot=90,
+        title="Salário por escolaridade sem outliers",
         showfliers=False,
     )
-    ax2.set_title("Salário por escolaridade sem outliers")
-    st.pyplot(ax2.get_figure())
+
+    _salary_median_comparison(df, by=settings.ED_LEVEL)
 
 
 def _salary_country(df: pd.DataFrame) -> None:
@@ -129,16 +133,16 @@ def _salary_country(df: pd.DataFrame) -> None:
         Seguindo o padrão nas outras sub-seções, os numerosos outliers
         dificultam a análise, e por isso podemos concentrar a atenção no painel
         seguinte. A tendência central parece indicar que os Estados Unidos
-        apresentam níveis de salários mais elevados, apesar de que com a alta
-        variabilidade apenas com um teste de hipóteses poderíamos confirmar
-        isso. Por outro lado, a análise visual por si só já indica que os
-        salários na Índia são significativamente mais baixos que nos outros
-        países.
+        apresentam níveis de salários mais elevados e que os salários na Índia
+        são mais baixos que nos outros países. Com a alta variabilidade, a
+        tabela após os gráficos permite confirmar essa impressão: países cujos
+        intervalos de confiança da mediana não se sobrepõem têm medianas
+        significativamente diferentes.
         """
     )
 
     # Group data by country
-    df_most_common_countries = _get_data_most_common_countries(df)
+    df_most_common_countries = get_data_most_common_countries(df)
 
     # Plot boxplots
     ax = df_most_common_countries.boxplot(
@@ -156,6 +160,7 @@ def _salary_country(df: pd.DataFrame) -> None:
     ax2.set_title(f"Salário nos {NUM_COUNTRIES} países sem outliers")
     st.pyplot(ax2.get_figure())
 
+    _salary_median_comparison(df_most_common_countries, by=settings.COUNTRY)
 
 
 def _salary_mentalhealth(df: pd.DataFrame) -> None:
@@ -180,28 +185,54 @@ def _salary_mentalhealth(df: pd.DataFrame) -> None:
         participantes que se enquadram em determinadas categorias possuem uma
         faixa de salário consistente o suficiente para não apresentar outliers
         como nas outras.
+
+        Por serem muitas combinações, os gráficos agrupam as menos frequentes
+        em "{settings.other_label}"; marque a opção acima de cada gráfico para
+        ver todas elas.
         """
     )
 
-    ax = df.boxplot(
-        column=settings.YEARLY_SALARY, by=settings.MENTAL_HEALTH, rot=90
+    _salary_box_plot(
+        df,
+        by=settings.MENTAL_HEALTH,
+        title="Salário por saúde mental",
+        callback=reduce_font_size,
     )
-    ax.set_title("Salário por saúde mental")
-    # Reduce font size
-    for item in ax.get_xticklabels():
-        item.set_fontsize(5)
-    st.pyplot(ax.get_figure())
 
-    ax2 = df.boxplot(
-        column=settings.YEARLY_SALARY,
+    _salary_box_plot(
+        df,
         by=settings.MENTAL_HEALTH,
-        rot=90,
+        title="Salário por saúde mental sem outliers",
         showfliers=False,
+        callback=reduce_font_size,
+    )
+
+
+def _salary_distributions(df: pd.DataFrame) -> None:
+    """Full salary distributions in logarithmic scale"""
+    st.markdown("#### Distribuição completa dos salários")
+    st.markdown(
+        """
+        Os boxplots acima são dominados por poucos valores extremos, e a única
+        alternativa até aqui foi escondê-los. Os histogramas abaixo mostram a
+        distribuição completa dos salários de cada grupo em escala
+        logarítmica, onde os outliers aparecem apenas como pequenas barras nas
+        pontas. As alturas representam a fração de cada grupo, permitindo
+        comparar grupos de tamanhos diferentes.
+        """
+    )
+
+    _salary_histogram_plot(
+        df, by=settings.AGE, title="Distribuição de salários por idade"
+    )
+    _salary_histogram_plot(
+        df,
+        by=settings.ED_LEVEL,
+        title="Distribuição de salários por escolaridade",
+    )
+    _salary_histogram_plot(
+        df, by=settings.COUNTRY, title="Distribuição de salários por país"
     )
-    ax2.set_title("Salário por saúde mental sem outliers")
-    for item in ax2.get_xticklabels():
-        item.set_fontsize(5)
-    st.pyplot(ax2.get_figure())
 
 
 def _professional_analyses(df_raw: pd.DataFrame) -> None:
@@ -217,7 +248,7 @@ def _professional_analyses(df_raw: pd.DataFrame) -> None:
         """
     )
 
-    df = df_raw[df_raw[settings.EMPLOYMENT] == settings.EMPLOYED_FULL_TIME]
+    df = full_time_rows(df_raw)
 
     _professional_and_edlevel(df)
     _professional_and_companysize(df)
@@ -236,7 +267,7 @@ def _professional_and_edlevel(df: pd.DataFrame) -> None:
         """
     )
 
-    df_group = df.groupby(by=settings.ED_LEVEL).size().sort_values()
+    df_group = group_sizes(df, by=settings.ED_LEVEL)
 
     bar_plot(
         df_group,
@@ -264,7 +295,7 @@ def _professional_and_companysize(df: pd.DataFrame) -> None:
         """
     )
 
-    df_group = df.groupby(by=settings.ORG_SIZE).size().sort_values()
+    df_group = group_sizes(df, by=settings.ORG_SIZE)
 
     bar_plot(
         df_group,
@@ -306,15 +337,14 @@ def _python_salary_global(df: pd.DataFrame) -> None:
         comodidade, já removemos os outliers uma vez que eles obstruem este
         tipo de análise.
 
-        Como se vê, não parece haver diferença significativa entre os grupos, o
-        que é um bom indicativo de que independente da linguagem escolhida é
-        possível prosperar nesta área.
+        Visualmente os grupos são parecidos, e o teste de hipóteses abaixo
+        indica se a diferença entre suas medianas é significativa. Não havendo
+        diferença, este é um bom indicativo de que independente da linguagem
+        escolhida é possível prosperar nesta área.
         """
     )
 
-    mask = df[settings.USED_LANGUAGES].str.contains("Python")
-    df.loc[:, settings.USE_PYTHON] = False
-    df.loc[mask, settings.USE_PYTHON] = True
+    df = _with_use_python(df)
 
     ax = df.boxplot(
         column=settings.YEARLY_SALARY,
@@ -327,6 +357,14 @@ def _python_salary_global(df: pd.DataFrame) -> None:
     )
     st.pyplot(ax.get_figure())
 
+    _salary_median_comparison(df, by=settings.USE_PYTHON)
+
+    _salary_histogram_plot(
+        df,
+        by=settings.USE_PYTHON,
+        title="Distribuição de salários entre quem trabalha ou não com Python",
+    )
+
 
 def _python_salary_brazil(df: pd.DataFrame) -> None:
     """Salary of Python developers in Brazil"""
@@ -341,10 +379,7 @@ def _python_salary_brazil(df: pd.DataFrame) -> None:
         """
     )
 
-    df_brazil = df[df[settings.COUNTRY] == settings.BRAZIL]
-    mask = df_brazil[settings.USED_LANGUAGES].str.contains("Python")
-    df_brazil.loc[:, settings.USE_PYTHON] = False
-    df_brazil.loc[mask, settings.USE_PYTHON] = True
+    df_brazil = _with_use_python(df[df[settings.COUNTRY] == settings.BRAZIL])
 
     ax = df_brazil.boxplot(
         column=settings.YEARLY_SALARY,
@@ -370,12 +405,9 @@ def _python_salary_most_common_countries(df: pd.DataFrame) -> None:
         """
     )
 
-    df_most_common_countries = _get_data_most_common_countries(df)
-    mask = df_most_common_countries[
-        settings.USED_LANGUAGES
-    ].str.contains("Python")
-    df_most_common_countries.loc[:, settings.USE_PYTHON] = False
-    df_most_common_countries.loc[mask, settings.USE_PYTHON] = True
+    df_most_common_countries = _with_use_python(
+        get_data_most_common_countries(df)
+    )
 
     ax = df_most_common_countries.boxplot(
         column=settings.YEARLY_SALARY,
@@ -404,9 +436,9 @@ def _python_opsys(df_raw: pd.DataFrame) -> None:
         caso parece fazer sentido.
         """
     )
-    df = df_raw[df_raw[settings.USED_LANGUAGES].str.contains("Python")]
+    df = python_rows(df_raw)
 
-    df_group = df.groupby(by=settings.OP_SYS).size().sort_values()
+    df_group = group_sizes(df, by=settings.OP_SYS)
     bar_plot(
         df_group,
         title="Sistema Operacional de Programadores Python",
@@ -417,10 +449,121 @@ def _python_opsys(df_raw: pd.DataFrame) -> None:
     )
 
 
-def _get_data_most_common_countries(df: pd.DataFrame) -> pd.DataFrame:
+def _salary_box_plot(
+    df: pd.DataFrame,
+    by: str,
+    title: str,
+    showfliers: bool = True,
+    callback: Optional[Callable] = None,
+) -> None:
+    """Boxplot of yearly salaries per group of `by`
+
+    Groups beyond the largest `chart_top_k` are merged into a single box, so
+    its statistics are computed over all of their salaries together.
+    """
+    groups = df[by]
+    k = top_k_to_show(groups.nunique(), title)
+    if k is not None:
+        kept = group_sizes(df, by=by).index[-k:]
+        groups = groups.where(groups.isin(kept), settings.other_label)
+
+    df_plot = pd.DataFrame(
+        {settings.YEARLY_SALARY: df[settings.YEARLY_SALARY], by: groups}
+    )
+    ax = df_plot.boxplot(
+        column=settings.YEARLY_SALARY, by=by, rot=90, showfliers=showfliers
+    )
+    ax.set_title(title)
+
+    if callback:
+        callback(ax)
+
+    st.pyplot(ax.get_figure())
+
+
+def _salary_histogram_plot(df: pd.DataFrame, by: str, title: str) -> None:
+    """Small multiples of the log-binned salary histogram of each group"""
+    histogram = salary_histogram(df, by=by)
+    histogram = histogram.top_k(top_k_to_show(histogram.groups.size, title))
+
+    # Share of each group per bin, so groups of any size are comparable
+    totals = np.maximum(histogram.counts.sum(axis=1, keepdims=True), 1)
+    shares = histogram.counts / totals
+
+    fig, axes = plt.subplots(
+        histogram.groups.size,
+        1,
+        sharex=True,
+        squeeze=False,
+        figsize=(6.4, 1 + 0.4 * histogram.groups.size),
+    )
+    for ax, group, share in zip(axes[:, 0], histogram.groups, shares):
+        ax.bar(
+            histogram.edges[:-1],
+            share,
+            width=np.diff(histogram.edges),
+            align="edge",
+        )
+        ax.set_xscale("log")
+        ax.set_yticks([])
+        ax.set_ylabel(
+            str(group), rotation=0, ha="right", va="center", fontsize=6
+        )
+    axes[0, 0].set_title(title)
+    axes[-1, 0].set_xlabel("Salário anual (USD, escala logarítmica)")
+
+    st.pyplot(fig)
+
+
+def _salary_median_comparison(df: pd.DataFrame, by: Grouping) -> None:
+    """Show median confidence intervals and a permutation test per group"""
+    df_ci, p_value = compare_salary_medians(df, by=by)
+    significance = _decimal(settings.stats_significance, 2)
+    if p_value < settings.stats_significance:
+        conclusion = (
+            f"abaixo de {significance}: há diferença significativa entre as "
+            "medianas de ao menos dois grupos"
+        )
+    else:
+        conclusion = (
+            f"não inferior a {significance}: não há diferença significativa "
+            "entre as medianas dos grupos"
+        )
+
+    st.markdown(
+        f"""
+        A tabela abaixo mostra a mediana salarial de cada grupo com seu
+        intervalo de confiança de {settings.stats_confidence:.0%} obtido por
+        _bootstrap_. Um teste de permutação sobre as medianas de todos os
+        grupos resulta em um p-valor de {_decimal(p_value, 4)}, {conclusion}.
+        """
+    )
+    st.table(
+        df_ci.rename(
+            columns={
+                "n": "Participantes",
+                "median": "Mediana",
+                "ci_low": "IC inferior",
+                "ci_high": "IC superior",
+            }
+        )
+    )
+
+
+def get_data_most_common_countries(df: pd.DataFrame) -> pd.DataFrame:
     """Get a dataframe with only the most answered countries"""
-    df_group = df.groupby(by=settings.COUNTRY).size().sort_values()
+    df_group = group_sizes(df, by=settings.COUNTRY)
     most_common_countries = df_group.keys()[-NUM_COUNTRIES:]
     return df[
         df[settings.COUNTRY].isin(most_common_countries)
     ]
+
+
+def _with_use_python(df: pd.DataFrame) -> pd.DataFrame:
+    """Copy of `df` with a column telling who works with Python"""
+    return df.assign(**{settings.USE_PYTHON: uses_python(df)})
+
+
+def _decimal(value: float, digits: int) -> str:
+    """Number formatted with a decimal comma, as written in Portuguese"""
+    return f"{value:.{digits}f}".replace(".", ",")
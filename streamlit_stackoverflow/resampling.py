@@ -0,0 +1,168 @@
+"""Bootstrap and permutation tests on salary medians"""
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from config import settings
+
+from streamlit_stackoverflow.caching import memoize
+
+
+Grouping = Union[str, List[str]]
+
+
+@memoize
+def compare_salary_medians(
+    df: pd.DataFrame, by: Grouping
+) -> Tuple[pd.DataFrame, float]:
+    """Confidence intervals and permutation p-value of salaries grouped `by`
+
+    Results are cached per dataset version, so only the first call for each
+    grouping pays for the resampling.
+    """
+    return (
+        bootstrap_median_ci(df, by),
+        permutation_test_medians(df, by),
+    )
+
+
+def bootstrap_median_ci(
+    df: pd.DataFrame,
+    by: Grouping,
+    column: str = settings.YEARLY_SALARY,
+    resamples: Optional[int] = None,
+    confidence: Optional[float] = None,
+    seed: Optional[int] = None,
+    workers: Optional[int] = None,
+) -> pd.DataFrame:
+    """Bootstrap confidence interval of the median of `column` per group
+
+    Returns a frame indexed by group with the columns `n`, `median`, `ci_low`
+    and `ci_high`. Each group gets its own child seed, so results do not
+    depend on the number of `workers` used.
+    """
+    resamples = resamples or settings.stats_resamples
+    confidence = confidence or settings.stats_confidence
+    seed = settings.stats_seed if seed is None else seed
+    workers = workers or settings.stats_workers
+
+    groups, values, bounds = _grouped_values(df, by, column)
+    samples = [values[start:stop] for start, stop in zip(bounds, bounds[1:])]
+    seeds = np.random.SeedSequence(seed).spawn(len(samples))
+    args = (
+        samples,
+        [resamples] * len(samples),
+        [1 - confidence] * len(samples),
+        seeds,
+        [settings.stats_max_batch_elements] * len(samples),
+    )
+
+    if workers > 1 and len(samples) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            intervals = list(executor.map(_bootstrap_interval, *args))
+    else:
+        intervals = list(map(_bootstrap_interval, *args))
+
+    ci_low, ci_high = zip(*intervals) if intervals else ((), ())
+    return pd.DataFrame(
+        {
+            "n": [sample.size for sample in samples],
+            "median": [np.median(sample) for sample in samples],
+            "ci_low": ci_low,
+            "ci_high": ci_high,
+        },
+        index=groups,
+    )
+
+
+def permutation_test_medians(
+    df: pd.DataFrame,
+    by: Grouping,
+    column: str = settings.YEARLY_SALARY,
+    permutations: Optional[int] = None,
+    seed: Optional[int] = None,
+) -> float:
+    """P-value of the hypothesis that all groups share the same median
+
+    The statistic is the distance of each group median to the pooled median,
+    weighted by group size. Group labels are shuffled by permuting the values
+    while keeping the group boundaries fixed.
+    """
+    permutations = permutations or settings.stats_permutations
+    seed = settings.stats_seed if seed is None else seed
+
+    _, values, bounds = _grouped_values(df, by, column)
+    if len(bounds) < 3:
+        return 1.0  # a single group can not differ from itself
+
+    pooled_median = np.median(values)
+    observed = _median_spread(values[np.newaxis, :], bounds, pooled_median)[0]
+
+    rng = np.random.default_rng(seed)
+    batch = max(1, settings.stats_max_batch_elements // values.size)
+    num_extreme = 0
+    for start in range(0, permutations, batch):
+        size = min(batch, permutations - start)
+        shuffled = rng.permuted(np.tile(values, (size, 1)), axis=1)
+        spread = _median_spread(shuffled, bounds, pooled_median)
+        num_extreme += np.count_nonzero(spread >= observed)
+
+    return (num_extreme + 1) / (permutations + 1)
+
+
+def _grouped_values(
+    df: pd.DataFrame, by: Grouping, column: str
+) -> Tuple[pd.Index, np.ndarray, np.ndarray]:
+    """Group keys, values sorted by group and the boundaries of each group
+
+    Values of group `i` are in `values[bounds[i]:bounds[i + 1]]`.
+    """
+    df = df[~df[column].isna()]
+    grouped = df.groupby(by=by)
+    codes = grouped.ngroup().to_numpy()
+    sizes = grouped.size()
+
+    # Rows with a missing group key are numbered -1 and left out
+    order = np.argsort(codes, kind="stable")[np.count_nonzero(codes < 0):]
+    values = df[column].to_numpy(dtype=float)[order]
+    bounds = np.concatenate([[0], np.cumsum(sizes.to_numpy())])
+    return sizes.index, values, bounds
+
+
+def _bootstrap_interval(
+    values: np.ndarray,
+    resamples: int,
+    alpha: float,
+    seed: np.random.SeedSequence,
+    max_batch_elements: int,
+) -> Tuple[float, float]:
+    """Percentile interval of bootstrapped medians for a single group
+
+    Resamples are drawn as one 2-D index array, split in batches only when it
+    would hold more than `max_batch_elements` entries.
+    """
+    rng = np.random.default_rng(seed)
+    batch = max(1, max_batch_elements // values.size)
+    medians = np.empty(resamples)
+    for start in range(0, resamples, batch):
+        stop = min(start + batch, resamples)
+        indices = rng.integers(
+            0, values.size, size=(stop - start, values.size)
+        )
+        medians[start:stop] = np.median(values[indices], axis=1)
+
+    low, high = np.quantile(medians, [alpha / 2, 1 - alpha / 2])
+    return low, high
+
+
+def _median_spread(
+    samples: np.ndarray, bounds: np.ndarray, pooled_median: float
+) -> np.ndarray:
+    """Size-weighted distance of group medians to the pooled one, per row"""
+    spread = np.zeros(samples.shape[0])
+    for start, stop in zip(bounds, bounds[1:]):
+        group_medians = np.median(samples[:, start:stop], axis=1)
+        spread += (stop - start) * np.abs(group_medians - pooled_median)
+    return spread
+
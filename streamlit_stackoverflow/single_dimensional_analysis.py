@@ -1,5 +1,5 @@
 """Analyses on a single variable"""
-from typing import Callable, Optional
+from typing import Callable, Optional, Set
 
 import matplotlib.pyplot as plt
 import numpy as np
@@ -7,6 +7,18 @@ import pandas as pd
 import streamlit as st
 from config import settings
 
+from streamlit_stackoverflow.caching import memoize
+from streamlit_stackoverflow.data_handling import (
+    full_time_rows, on_refresh, python_rows, salary_rows
+)
+from streamlit_stackoverflow.languages import (
+    language_cooccurrence, language_migration
+)
+
+
+# Columns with sizes computed so far, the only ones worth folding
+_computed_bys: Set[str] = set()
+
 
 def single_dimensional_section(df: pd.DataFrame) -> None:
     """Plots and analyses with only variable"""
@@ -53,7 +65,7 @@ def _education_levels(df: pd.DataFrame) -> None:
         """
     )
 
-    df_group = df.groupby(by=settings.ED_LEVEL).size().sort_values()
+    df_group = group_sizes(df, by=settings.ED_LEVEL)
     bar_plot(
         df_group,
         title="Participantes por Nível de Escolaridade",
@@ -72,10 +84,11 @@ def _years_code(df: pd.DataFrame) -> None:
 
     # Years of code
     st.markdown(
-        """
+        f"""
         O gráfico abaixo indica que os grupos de pessoas que mais aparecem
         têm 5 ou 10 anos de prática. Em contrapartida, participantes com mais
-        de 40 anos de programação são mais raros.
+        de 40 anos de programação são tão raros que ficam agrupados em
+        "{settings.other_label}"; marque a opção acima do gráfico para vê-los.
 
         Apesar disso, é interessante ver como há pessoas que provavelmente
         iniciaram esta vida sem as vantagens da internet e linguagens mais
@@ -83,17 +96,17 @@ def _years_code(df: pd.DataFrame) -> None:
         """
     )
 
-    df_group = df.groupby(by=settings.YEARS_CODE).size().sort_values()
+    df_group = group_sizes(df, by=settings.YEARS_CODE)
 
     bar_plot(
         df_group,
         title="Participantes por tempo de programação",
-        callback=_reduce_font_size,
+        callback=reduce_font_size,
     )
 
     # Years of code pro
     st.markdown(
-        """
+        f"""
         Quando consideramos tempo de prática profissional (provavelmente em
         empresas ou universidades), o quadro permanece similar com exceção de
         que a esmagadora maior parte dos participantes não forneceu seus dados.
@@ -103,16 +116,17 @@ def _years_code(df: pd.DataFrame) -> None:
 
         Excluindo esta parte, podemos ver, como antes, que a maior parte dos
         participantes possui menos de 10 anos de experiência profissional,
-        enquanto minoria está no outro extremo com mais de 40 anos.
+        enquanto a minoria, no outro extremo com mais de 40 anos, só aparece
+        fora de "{settings.other_label}" ao marcar a opção acima do gráfico.
         """
     )
 
-    df_group2 = df.groupby(by=settings.YEARS_CODE_PRO).size().sort_values()
+    df_group2 = group_sizes(df, by=settings.YEARS_CODE_PRO)
 
     bar_plot(
         df_group2,
         title="Participantes por tempo de programação profissional",
-        callback=_reduce_font_size,
+        callback=reduce_font_size,
     )
 
 
@@ -134,7 +148,7 @@ def _employment(df: pd.DataFrame) -> None:
         """
     )
 
-    df_group = df.groupby(by=settings.EMPLOYMENT).size().sort_values()
+    df_group = group_sizes(df, by=settings.EMPLOYMENT)
 
     bar_plot(
         df_group,
@@ -152,7 +166,7 @@ def _country(df: pd.DataFrame) -> None:
 
     st.subheader("País")
 
-    df_group = df.groupby(by=settings.COUNTRY).size().sort_values()
+    df_group = group_sizes(df, by=settings.COUNTRY)
     st.markdown(
         f"""
         Determinar a quantidade de pessoas por país que respondeu à pesquisa
@@ -166,31 +180,33 @@ def _country(df: pd.DataFrame) -> None:
     bar_plot(
         df_group,
         title="Participantes por País",
-        callback=_reduce_font_size,
+        callback=reduce_font_size,
     )
 
     st.markdown(
-        """
+        f"""
         Podemos então focar nos Estados Unidos. O gráfico abaixo mostra a
         distribuição de participantes por estado, excluindo os resultados sem
         resposta, o que provavelmente seria de pessoas fora dos EUA que
         decidiram não responder.
 
-        Neste caso, a maior parte das pessoas reside na Califórnia e a minoria
-        em _American Samoa_. O fato de o _Silicon Valley_ estar localizado
-        neste estado pode ter relação com este número maior, mas seria
-        necessário outro estudo para confirmar algum tipo de causa ou outro
-        possível fator.
+        Neste caso, a maior parte das pessoas reside na Califórnia, enquanto
+        os estados com menos participantes, como _American Samoa_, ficam em
+        "{settings.other_label}" a menos que a opção acima do gráfico seja
+        marcada. O fato de o _Silicon Valley_ estar localizado na Califórnia
+        pode ter relação com este número maior, mas seria necessário outro
+        estudo para confirmar algum tipo de causa ou outro possível fator.
         """
     )
 
     # Group by state but removing the NaN
-    df_group2 = df.groupby(by=settings.US_STATE).size().sort_values()
-    df_group2.pop(settings.default_str_nan)
+    df_group2 = group_sizes(df, by=settings.US_STATE).drop(
+        settings.default_str_nan
+    )
     bar_plot(
         df_group2,
         title="Participantes por estado nos Estados Unidos",
-        callback=_reduce_font_size,
+        callback=reduce_font_size,
     )
 
     pie_plot(
@@ -254,11 +270,127 @@ def _languages(df: pd.DataFrame) -> None:
     ax2.set_title("Participantes que querem trabalhar com Python")
     st.pyplot(fig2)
 
+    st.markdown(
+        """
+        Indo além de Python, podemos ver quais linguagens costumam ser usadas
+        em conjunto. No primeiro mapa de calor abaixo, cada célula indica
+        quantos participantes trabalham com as duas linguagens, e a diagonal
+        quantos trabalham com cada uma.
+
+        O segundo mapa mostra, dentre quem trabalha com a linguagem da linha,
+        a fração que gostaria de trabalhar com a linguagem da coluna. Assim é
+        possível perceber para quais linguagens as pessoas desejam migrar.
+        Os dois gráficos podem ser restritos a um país específico.
+        """
+    )
+
+    all_countries = "Todos"
+    country = st.selectbox(
+        "País considerado nas matrizes de linguagens",
+        [all_countries] + sorted(df[settings.COUNTRY].dropna().unique()),
+    )
+    country_mask = None
+    if country != all_countries:
+        country_mask = df[settings.COUNTRY] == country
+
+    df_cooccurrence = language_cooccurrence(df, mask=country_mask)
+    heatmap_plot(
+        df_cooccurrence,
+        title="Participantes que trabalham com ambas as linguagens",
+    )
+
+    # Share of the users of each language, avoiding division by zero
+    num_users = np.maximum(np.diag(df_cooccurrence), 1)
+    df_migration = language_migration(df, mask=country_mask)
+    df_migration = df_migration.div(num_users, axis=0)
+    heatmap_plot(
+        df_migration,
+        title="Fração de quem trabalha com a linguagem e deseja outra",
+    )
+
+
+@memoize
+def group_sizes(df: pd.DataFrame, by: str) -> pd.Series:
+    """Number of participants per value of `by`, in ascending order"""
+    _computed_bys.add(by)
+    return df.groupby(by=by).size().sort_values()
+
+
+def add_group_sizes(
+    df_group: pd.Series, df_group_tail: pd.Series
+) -> pd.Series:
+    """Sizes of both groupings together, ordered like `group_sizes`"""
+    return (
+        df_group.add(df_group_tail, fill_value=0)
+        .astype(df_group.dtype)
+        .sort_index()
+        .sort_values()
+    )
+
+
+@on_refresh
+def _fold_new_rows(
+    df: pd.DataFrame, df_tail: pd.DataFrame, df_new: pd.DataFrame
+) -> None:
+    """Add the sizes of the appended rows to the cached ones
+
+    Sizes are folded for the whole data and for the subsets of rows the
+    sections count, as only for those the subset of the new rows is known.
+    """
+    for rows in (lambda df: df, salary_rows, full_time_rows, python_rows):
+        df_rows, df_rows_new = rows(df), rows(df_new)
+        for by in list(_computed_bys):
+            cached = group_sizes.peek(df_rows, by=by)
+            if cached is not None:
+                df_group_tail = rows(df_tail).groupby(by=by).size()
+                group_sizes.put(
+                    add_group_sizes(cached, df_group_tail), df_rows_new, by=by
+                )
+
+
+def top_k(df_group: pd.Series, k: Optional[int]) -> pd.Series:
+    """Keep the `k` largest groups, summing the others in an "other" group
+
+    The other group comes first, followed by the kept groups in their
+    original order. A `k` of None keeps every group.
+    """
+    if k is None or df_group.size <= k:
+        return df_group
+
+    kept = df_group.nlargest(k).index
+    is_kept = df_group.index.isin(kept)
+    df_other = pd.Series(
+        [df_group[~is_kept].sum()], index=[settings.other_label]
+    )
+    # Labels become strings so the other label can be mixed with them
+    return pd.concat([df_other, df_group[is_kept].rename(index=str)])
+
+
+def top_k_to_show(num_groups: int, title: str) -> Optional[int]:
+    """Number of groups a chart should show, or None to show all of them
+
+    Charts with more than `chart_top_k` groups get a checkbox to drill down
+    into every group instead of the folded view.
+    """
+    k = settings.chart_top_k
+    # Folding a single group into "other" would not save anything
+    if not k or num_groups <= k + 1:
+        return None
+
+    show_all = st.checkbox(
+        f"Mostrar todas as {num_groups} categorias em: {title}",
+        value=False,
+        key=f"show_all_{title}",
+    )
+    return None if show_all else k
+
 
 def bar_plot(
     df_group: pd.DataFrame, title: str, callback: Optional[Callable] = None
 ):
     """Creat a bar plot grouping data by specific column"""
+    df_group = top_k(df_group, top_k_to_show(df_group.size, title))
+
     fig, ax = plt.subplots()
     ax.bar(df_group.keys(), df_group.values)
     ax.set_title(title)
@@ -272,6 +404,8 @@ def bar_plot(
 
 def pie_plot(df_group: pd.DataFrame, title: str):
     """Create a pie plot"""
+    df_group = top_k(df_group, top_k_to_show(df_group.size, title))
+
     fig, ax = plt.subplots()
     ax.pie(
         df_group.values,
@@ -283,7 +417,20 @@ def pie_plot(df_group: pd.DataFrame, title: str):
     st.pyplot(fig)
 
 
-def _reduce_font_size(ax, font_size: int = 5):
+def heatmap_plot(df_matrix: pd.DataFrame, title: str, font_size: int = 5):
+    """Create a heatmap with rows and columns labeled by the frame axes"""
+    fig, ax = plt.subplots()
+    image = ax.imshow(df_matrix.values, cmap="viridis")
+    ax.set_xticks(np.arange(df_matrix.columns.size))
+    ax.set_xticklabels(df_matrix.columns, rotation=90, fontsize=font_size)
+    ax.set_yticks(np.arange(df_matrix.index.size))
+    ax.set_yticklabels(df_matrix.index, fontsize=font_size)
+    ax.set_title(title)
+    fig.colorbar(image, ax=ax)
+    st.pyplot(fig)
+
+
+def reduce_font_size(ax, font_size: int = 5):
     """Callback to reduce xlabel font size"""
     for item in ax.get_xticklabels():
         item.set_fontsize(font_size)
@@ -0,0 +1,141 @@
+"""Fill the caches before the app starts serving
+
+Run ``python -m streamlit_stackoverflow.warmup`` instead of ``streamlit run
+main.py``: the data is loaded and the computations used by the sections are
+cached in this process, and only then the Streamlit server starts, so its
+health check does not report ready while the caches are cold. Any extra
+arguments are passed on to ``streamlit run``.
+"""
+import logging
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+from config import settings
+
+from streamlit_stackoverflow.data_handling import (
+    full_time_rows, load_data, python_rows, salary_rows, uses_python
+)
+from streamlit_stackoverflow.distributions import salary_histogram
+from streamlit_stackoverflow.languages import language_matrices
+from streamlit_stackoverflow.multi_dimensional_analysis import (
+    get_data_most_common_countries
+)
+from streamlit_stackoverflow.resampling import compare_salary_medians
+from streamlit_stackoverflow.single_dimensional_analysis import group_sizes
+
+
+logger = logging.getLogger(__name__)
+
+
+def warm_up(workers: Optional[int] = None) -> Dict[str, float]:
+    """Load the data and cache what the sections compute, timing each step
+
+    The salary statistics, by far the slowest step, are computed in `workers`
+    processes when it is larger than zero.
+    """
+    workers = settings.warmup_workers if workers is None else workers
+    timings: Dict[str, float] = {}
+
+    df = _timed("load data", load_data, timings)
+    df_salary = salary_rows(df)
+    df_full_time = full_time_rows(df)
+    df_python = python_rows(df)
+
+    # Same frames and groupings used by the sections, so the keys match
+    groupings = [
+        (df, settings.ED_LEVEL),
+        (df, settings.YEARS_CODE),
+        (df, settings.YEARS_CODE_PRO),
+        (df, settings.EMPLOYMENT),
+        (df, settings.COUNTRY),
+        (df, settings.US_STATE),
+        (df_salary, settings.AGE),
+        (df_salary, settings.ED_LEVEL),
+        (df_salary, settings.MENTAL_HEALTH),
+        (df_salary, settings.COUNTRY),
+        (df_full_time, settings.ED_LEVEL),
+        (df_full_time, settings.ORG_SIZE),
+        (df_python, settings.OP_SYS),
+    ]
+    steps: List[Tuple[str, Callable]] = [
+        (
+            f"group sizes by {by}",
+            lambda df_group=df_group, by=by: group_sizes(df_group, by=by),
+        )
+        for df_group, by in groupings
+    ]
+    steps.append(("language matrices", lambda: language_matrices(df)))
+    steps.extend(
+        (
+            f"salary histogram by {by}",
+            lambda by=by: salary_histogram(df, by=by),
+        )
+        for by in (
+            settings.AGE,
+            settings.ED_LEVEL,
+            settings.COUNTRY,
+            settings.USE_PYTHON,
+        )
+    )
+    for number, (name, step) in enumerate(steps, start=1):
+        _timed(f"[{number}/{len(steps)}] {name}", step, timings)
+
+    # Only the salary and group columns are sent to the worker processes
+    df_countries = get_data_most_common_countries(df_salary)
+    comparisons = [
+        df_salary[[settings.YEARLY_SALARY, settings.ED_LEVEL]],
+        df_countries[[settings.YEARLY_SALARY, settings.COUNTRY]],
+        df[[settings.YEARLY_SALARY]].assign(
+            **{settings.USE_PYTHON: uses_python(df)}
+        ),
+    ]
+    _timed(
+        f"salary statistics in {max(workers, 1)} process(es)",
+        lambda: _warm_up_comparisons(comparisons, workers),
+        timings,
+    )
+
+    logger.info("Warm-up finished in %.2fs", sum(timings.values()))
+    return timings
+
+
+def _warm_up_comparisons(frames: List[pd.DataFrame], workers: int) -> None:
+    """Cache the salary comparisons of frames with the group as last column"""
+    bys = [frame.columns[-1] for frame in frames]
+    if workers > 0:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(compare_salary_medians, frames, bys))
+        for result, frame, by in zip(results, frames, bys):
+            compare_salary_medians.put(result, frame, by=by)
+    else:
+        for frame, by in zip(frames, bys):
+            compare_salary_medians(frame, by=by)
+
+
+def _timed(name: str, step: Callable, timings: Dict[str, float]):
+    """Run `step`, logging and recording how long it took"""
+    start = time.perf_counter()
+    result = step()
+    timings[name] = time.perf_counter() - start
+    logger.info("%s: %.2fs", name, timings[name])
+    return result
+
+
+def _run_streamlit(args: List[str]) -> None:
+    """Start `streamlit run main.py` in this process, keeping its caches"""
+    try:
+        from streamlit.web import cli
+    except ImportError:  # streamlit < 1.12
+        from streamlit import cli
+
+    sys.argv = ["streamlit", "run", "main.py", *args]
+    cli.main()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    warm_up()
+    _run_streamlit(sys.argv[1:])
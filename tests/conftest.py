@@ -0,0 +1,59 @@
+import pandas as pd
+import pytest
+from config import settings
+
+from streamlit_stackoverflow import caching, data_handling
+
+
+# Columns of the test data files, the leading ones filled by the rows
+DATA_COLUMNS = [
+    settings.COUNTRY, settings.USED_LANGUAGES, settings.YEARLY_SALARY,
+    settings.AGE, settings.ED_LEVEL, settings.EMPLOYMENT,
+    settings.YEARS_CODE, settings.YEARS_CODE_PRO, settings.US_STATE,
+    settings.DESIRED_LANGUAGES, settings.MENTAL_HEALTH, settings.ORG_SIZE,
+    settings.OP_SYS,
+]
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Run every test with an empty cache, whatever the previous one left"""
+    caching.clear_cache()
+    yield
+    caching.clear_cache()
+
+
+@pytest.fixture
+def versioned():
+    """Tag frames with a dataset version, as the ones from `load_data`"""
+
+    def tag(df: pd.DataFrame, version: str = "test") -> pd.DataFrame:
+        df.attrs[data_handling.DATASET_VERSION] = version
+        return df
+
+    return tag
+
+
+@pytest.fixture
+def write_data(tmp_path, monkeypatch):
+    """Write rows to the data file read by `load_data`
+
+    Rows are tuples of (country, languages, salary, age, education,
+    employment), where trailing values may be left out and None is a missing
+    value. The other columns are left empty.
+    """
+    path = tmp_path / "data.csv"
+    monkeypatch.setattr(settings, "data_file", str(path))
+    monkeypatch.setattr(data_handling, "_loaded", None)
+
+    def write(rows, mode="w"):
+        with open(path, mode) as data_file:
+            if mode == "w":
+                data_file.write(",".join(DATA_COLUMNS) + "\n")
+            for row in rows:
+                values = ["" if value is None else str(value) for value in row]
+                values += [""] * (len(DATA_COLUMNS) - len(values))
+                data_file.write(",".join(values) + "\n")
+        return path
+
+    return write
@@ -0,0 +1,125 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pandas as pd
+import pytest
+from config import settings
+
+from streamlit_stackoverflow import api
+
+
+@pytest.fixture
+def server(write_data):
+    write_data(
+        [
+            ("Brazil", "Python;C", 10),
+            ("Brazil", "Go", 30),
+            ("India", "Python", 20),
+            ("India", "C", None),
+            ("India", "Python", 40),
+        ]
+    )
+
+    server = api.serve(host="127.0.0.1", port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def _get(url, etag=None):
+    request = urllib.request.Request(url)
+    if etag:
+        request.add_header("If-None-Match", etag)
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as error:
+        return error.code, error.headers, error.read()
+
+
+def test_counts(server):
+    status, headers, body = _get(f"{server}/counts/{settings.COUNTRY}")
+
+    assert status == 200
+    assert json.loads(body)["data"] == {"Brazil": 2, "India": 3}
+
+    status, _, _ = _get(
+        f"{server}/counts/{settings.COUNTRY}", etag=headers["ETag"]
+    )
+    assert status == 304
+
+
+def test_salaries_with_filters_and_fields(server):
+    status, _, body = _get(
+        f"{server}/salaries/{settings.USE_PYTHON}"
+        f"?{settings.COUNTRY}=India&fields=n,median"
+    )
+
+    assert status == 200
+    data = json.loads(body)["data"]
+    assert data == {"True": {"n": 2, "median": 30.0}}
+    assert isinstance(data["True"]["n"], int)
+
+
+def test_use_python_after_refresh(server, write_data):
+    url = f"{server}/counts/{settings.USE_PYTHON}"
+    _, headers, _ = _get(url)
+
+    write_data([("Chile", "Python", 50)], mode="a")
+    status, headers_new, body = _get(url, etag=headers["ETag"])
+
+    assert status == 200
+    assert headers_new["ETag"] != headers["ETag"]
+    assert json.loads(body)["data"] == {"False": 2, "True": 4}
+
+
+def test_counts_folded_on_refresh(server, write_data):
+    url = f"{server}/counts/{settings.COUNTRY}?{settings.USE_PYTHON}=True"
+    _get(url)
+    misses = api.group_counts.cache_info().misses
+
+    write_data([("Chile", "Python", 50), ("India", "Go", 60)], mode="a")
+    _, _, body = _get(url)
+
+    assert json.loads(body)["data"] == {"Brazil": 1, "Chile": 1, "India": 2}
+    assert api.group_counts.cache_info().misses == misses
+
+
+def test_use_python_ignores_stored_column():
+    df = pd.DataFrame(
+        {
+            settings.USED_LANGUAGES: ["Python", "Go", "Python;C"],
+            settings.USE_PYTHON: [True, False, None],
+        }
+    )
+
+    body = api.aggregate(df, "counts", settings.USE_PYTHON)
+
+    assert json.loads(body)["data"] == {"False": 1, "True": 2}
+
+
+def test_invalid_requests(server):
+    assert _get(f"{server}/counts/ResponseId")[0] == 404
+    assert _get(f"{server}/counts/{settings.COUNTRY}?Salary=1")[0] == 400
+    assert _get(f"{server}/salaries/{settings.AGE}?fields=mode")[0] == 400
+
+
+def test_start_in_background_with_port_taken(monkeypatch):
+    taken = api.serve(host="127.0.0.1", port=0)
+    monkeypatch.setattr(settings, "api_host", "127.0.0.1")
+    monkeypatch.setattr(settings, "api_port", taken.server_address[1])
+    monkeypatch.setattr(api, "_server", None)
+    monkeypatch.setattr(api, "_start_error", None)
+
+    # The error is recorded instead of raised, and not retried
+    api.start_in_background()
+    error = api._start_error
+    api.start_in_background()
+
+    assert isinstance(error, OSError)
+    assert api._start_error is error
+    assert api._server is None
+    taken.server_close()
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+from config import settings
+
+from streamlit_stackoverflow import caching
+
+
+def _make_data() -> pd.DataFrame:
+    return pd.DataFrame({settings.COUNTRY: ["Brazil", "India", "Brazil"]})
+
+
+@caching.memoize
+def _count(df: pd.DataFrame, by: str, normalize: bool = False) -> pd.Series:
+    return df[by].value_counts(normalize=normalize)
+
+
+def test_memoize(versioned):
+    df = versioned(_make_data())
+
+    result = _count(df, settings.COUNTRY)
+    assert _count(df, by=settings.COUNTRY, normalize=False) is result
+    assert _count(df, settings.COUNTRY, normalize=True) is not result
+
+    # Subsets of the same dataset are cached apart
+    assert _count(df[:2], settings.COUNTRY)["Brazil"] == 1
+
+    info = _count.cache_info()
+    assert (info.hits, info.misses, info.entries) == (1, 3, 3)
+    assert info.size > 0
+
+
+def test_memoize_without_version():
+    df = _make_data()
+
+    assert _count(df, settings.COUNTRY) is not _count(df, settings.COUNTRY)
+    assert _count.cache_info().entries == 0
+
+
+def test_memoize_drops_older_versions(versioned):
+    _count(versioned(_make_data(), "v1"), settings.COUNTRY)
+    _count(versioned(_make_data(), "v2"), settings.COUNTRY)
+
+    assert _count.cache_info().entries == 1
+    df_old = versioned(_make_data(), "v1")
+    assert _count.peek(df_old, settings.COUNTRY) is None
+
+
+def test_memoize_evicts_least_recently_used(versioned, monkeypatch):
+    @caching.memoize
+    def _array(df: pd.DataFrame, size: int) -> np.ndarray:
+        return np.zeros(size, dtype=np.uint8)
+
+    monkeypatch.setattr(settings, "cache_max_bytes", 2500)
+    df = versioned(_make_data())
+
+    _array(df, 1000)
+    _array(df, 1001)
+    _array(df, 1000)  # most recently used now
+    _array(df, 1002)
+
+    assert _array.peek(df, 1000) is not None
+    assert _array.peek(df, 1001) is None
+    assert caching.cache_info().size <= 2500
+
+
+def test_put_keeps_older_versions(versioned):
+    df = versioned(_make_data(), "v1")
+    df_new = versioned(_make_data(), "v2")
+    result = _count(df, settings.COUNTRY)
+
+    _count.put(result, df_new, settings.COUNTRY)
+
+    assert _count.peek(df, settings.COUNTRY) is result
+    assert _count.peek(df_new, settings.COUNTRY) is result
+
+
+def test_cached_arrays_are_read_only(versioned):
+    @caching.memoize
+    def _arrays(df: pd.DataFrame) -> tuple:
+        return np.arange(3), {"a": np.arange(2)}
+
+    array, positions = _arrays(versioned(_make_data()))
+
+    with pytest.raises(ValueError):
+        array[0] = 10
+    with pytest.raises(ValueError):
+        positions["a"][0] = 10
@@ -1,3 +1,4 @@
+import pandas as pd
 from config import settings
 
 from streamlit_stackoverflow import data_handling
@@ -49,3 +50,64 @@ def test_preprocess_data():
     # Assert no OP_SYS has NaN
     mask = df[settings.OP_SYS].isna()
     assert mask.sum() == 0
+
+
+def test_refresh_data(write_data):
+    path = write_data([("Brazil", "Python", 10), ("India", "C", 20)])
+    df = data_handling.preprocess_data()
+
+    # Nothing appended
+    assert data_handling.refresh_data(df) is df
+
+    # A partially written row is left for the next refresh
+    write_data([("Brazil", "Go", 30)], mode="a")
+    with open(path, "a") as data_file:
+        data_file.write(",,,")
+    df_new = data_handling.refresh_data(df)
+
+    assert list(df_new.index) == [0, 1, 2]
+    assert list(df_new[settings.COUNTRY]) == ["Brazil", "India", "Brazil"]
+    assert (df_new[settings.ED_LEVEL] == settings.default_str_nan).all()
+    assert data_handling.dataset_version(df_new) != (
+        data_handling.dataset_version(df)
+    )
+
+    # A rewritten file is loaded from scratch
+    write_data([("Germany", "Rust", 40)])
+    df_rewritten = data_handling.refresh_data(df_new)
+    assert list(df_rewritten[settings.COUNTRY]) == ["Germany"]
+
+
+def test_no_trailing_newline(write_data):
+    path = write_data([("Brazil", "Python", 10), ("India", "C", 20)])
+    path.write_bytes(path.read_bytes().rstrip(b"\n"))
+
+    # The last row is complete even without a newline
+    df = data_handling.preprocess_data()
+    assert list(df[settings.COUNTRY]) == ["Brazil", "India"]
+
+    with open(path, "a") as data_file:
+        data_file.write("\n")
+    write_data([("Chile", "Go", 30)], mode="a")
+    path.write_bytes(path.read_bytes().rstrip(b"\n"))
+    df_new = data_handling.refresh_data(df)
+
+    assert list(df_new[settings.COUNTRY]) == ["Brazil", "India", "Chile"]
+    assert data_handling.refresh_data(df_new) is df_new
+
+
+def test_refresh_data_matches_full_load(write_data):
+    write_data(
+        [
+            ("Brazil", "Python", 10, "18-24", "Master", "Student", "5", "2"),
+            ("India", "C", None, "25-34", None, None, "Less than 1 year"),
+        ]
+    )
+    df = data_handling.preprocess_data()
+
+    # Numbers in text columns are read as text, like in the full load
+    write_data([("Chile", "Go", 30, None, None, None, 5, 3)], mode="a")
+    df_new = data_handling.refresh_data(df)
+
+    pd.testing.assert_frame_equal(df_new, data_handling.preprocess_data())
+    assert df_new[settings.YEARS_CODE].value_counts()["5"] == 2
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+import pytest
+from config import settings
+
+from streamlit_stackoverflow import distributions
+
+
+def _make_data() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            settings.COUNTRY: ["Brazil", "India", "Brazil", "Chile", "India"],
+            settings.USED_LANGUAGES: ["Python", "C", "Go", "Python;Go", "C"],
+            settings.YEARLY_SALARY: [150.0, 1e9, np.nan, 20_000.0, 1.0],
+        }
+    )
+
+
+def test_salary_histogram(monkeypatch):
+    monkeypatch.setattr(settings, "histogram_bins", 4)
+    monkeypatch.setattr(settings, "histogram_min_salary", 100)
+    monkeypatch.setattr(settings, "histogram_max_salary", 1_000_000)
+
+    histogram = distributions.salary_histogram(
+        _make_data(), by=settings.COUNTRY
+    )
+
+    assert list(histogram.groups) == ["Brazil", "Chile", "India"]
+    np.testing.assert_allclose(histogram.edges, [1e2, 1e3, 1e4, 1e5, 1e6])
+    # Salaries out of the edges are counted in the first and last bins
+    np.testing.assert_array_equal(
+        histogram.counts, [[1, 0, 0, 0], [0, 0, 1, 0], [1, 0, 0, 1]]
+    )
+
+
+def test_salary_histogram_merge():
+    df = _make_data()
+
+    histogram = distributions.salary_histogram(df[:2], by=settings.COUNTRY)
+    histogram = histogram.merge(
+        distributions.salary_histogram(df[2:], by=settings.COUNTRY)
+    )
+
+    expected = distributions.salary_histogram(df, by=settings.COUNTRY)
+    assert list(histogram.groups) == list(expected.groups)
+    np.testing.assert_array_equal(histogram.counts, expected.counts)
+
+
+def test_salary_histogram_merge_different_bins():
+    histogram = distributions.salary_histogram(
+        _make_data(), by=settings.COUNTRY
+    )
+    other = histogram._replace(edges=histogram.edges * 2)
+
+    with pytest.raises(ValueError):
+        histogram.merge(other)
+
+
+def test_salary_histogram_top_k():
+    histogram = distributions.salary_histogram(
+        _make_data(), by=settings.COUNTRY
+    )
+
+    histogram_top = histogram.top_k(1)
+
+    assert list(histogram_top.groups) == [settings.other_label, "India"]
+    np.testing.assert_array_equal(
+        histogram_top.counts.sum(axis=0), histogram.counts.sum(axis=0)
+    )
+
+
+def test_fold_new_rows(versioned):
+    df = versioned(_make_data())
+    df_tail = pd.DataFrame(
+        {
+            settings.COUNTRY: ["Chile", "Peru"],
+            settings.USED_LANGUAGES: ["Python", "Rust"],
+            settings.YEARLY_SALARY: [1_000.0, 30_000.0],
+        },
+        index=[5, 6],
+    )
+    df_new = versioned(pd.concat([df, df_tail]), "test2")
+    for by in (settings.COUNTRY, settings.USE_PYTHON):
+        distributions.salary_histogram(df, by=by)
+
+    distributions._fold_new_rows(df, df_tail, df_new)
+
+    # Folded histograms match the ones built from scratch
+    df_scratch = df_new.copy()
+    df_scratch.attrs = {}
+    for by in (settings.COUNTRY, settings.USE_PYTHON):
+        folded = distributions.salary_histogram.peek(df_new, by=by)
+        expected = distributions.salary_histogram(df_scratch, by=by)
+        assert list(folded.groups) == list(expected.groups)
+        np.testing.assert_array_equal(folded.counts, expected.counts)
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+from config import settings
+
+from streamlit_stackoverflow.introduction import raw_data_page
+
+
+def _make_data() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            settings.COUNTRY: ["Brazil", "India", "Brazil", "Chile", "Brazil"],
+            settings.YEARLY_SALARY: [30.0, 10.0, np.nan, 20.0, 50.0],
+            settings.AGE: ["18-24"] * 5,
+        },
+        index=[10, 11, 12, 13, 14],
+    )
+
+
+def test_raw_data_page(versioned):
+    df_page = raw_data_page(
+        versioned(_make_data()),
+        page=1,
+        columns=[settings.COUNTRY],
+        page_size=2,
+    )
+
+    assert list(df_page.columns) == [settings.COUNTRY]
+    assert list(df_page.index) == [12, 13]
+
+
+def test_raw_data_page_sorted(versioned):
+    df_page = raw_data_page(
+        versioned(_make_data()),
+        page=0,
+        columns=[settings.YEARLY_SALARY],
+        sort_by=settings.YEARLY_SALARY,
+        descending=True,
+        page_size=5,
+    )
+
+    # Missing values stay last
+    assert list(df_page.index) == [14, 10, 13, 11, 12]
+
+
+def test_raw_data_page_filtered_and_sorted(versioned):
+    df = versioned(_make_data())
+
+    df_page = raw_data_page(
+        df,
+        page=0,
+        columns=[settings.COUNTRY, settings.YEARLY_SALARY],
+        sort_by=settings.YEARLY_SALARY,
+        filter_by=settings.COUNTRY,
+        filter_value="Brazil",
+        page_size=2,
+    )
+    assert list(df_page.index) == [10, 14]
+
+    df_page = raw_data_page(
+        df,
+        page=0,
+        columns=[settings.COUNTRY],
+        filter_by=settings.COUNTRY,
+        filter_value="Peru",
+    )
+    assert df_page.empty
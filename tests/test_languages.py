@@ -0,0 +1,73 @@
+import pandas as pd
+from config import settings
+
+from streamlit_stackoverflow import languages
+
+
+def _make_data() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            settings.COUNTRY: ["Brazil", "Brazil", "India", "India"],
+            settings.USED_LANGUAGES: [
+                "Python;C", "Python", settings.default_str_nan, "C;Go"
+            ],
+            settings.DESIRED_LANGUAGES: [
+                "Rust", "Python;Rust", "Go", settings.default_str_nan
+            ],
+        },
+        index=[10, 11, 12, 13],
+    )
+
+
+def test_language_cooccurrence(versioned):
+    df_cooccurrence = languages.language_cooccurrence(versioned(_make_data()))
+
+    assert list(df_cooccurrence.index) == ["C", "Go", "Python", "Rust"]
+    assert df_cooccurrence.loc["Python", "Python"] == 2
+    assert df_cooccurrence.loc["Python", "C"] == 1
+    assert df_cooccurrence.loc["C", "Go"] == 1
+    assert df_cooccurrence.loc["Python", "Go"] == 0
+    assert (df_cooccurrence.values == df_cooccurrence.values.T).all()
+
+
+def test_language_migration_with_mask(versioned):
+    df = versioned(_make_data())
+
+    df_migration = languages.language_migration(
+        df, mask=df[settings.COUNTRY] == "Brazil"
+    )
+
+    assert df_migration.loc["Python", "Rust"] == 2
+    assert df_migration.loc["Python", "Python"] == 1
+    assert df_migration.loc["C", "Rust"] == 1
+    assert df_migration.loc["C", "Go"] == 0
+    assert df_migration.values.sum() == 4
+
+
+def test_fold_new_rows(versioned):
+    df = versioned(_make_data())
+    df_tail = pd.DataFrame(
+        {
+            settings.COUNTRY: ["Brazil"],
+            settings.USED_LANGUAGES: ["Python;Kotlin"],
+            settings.DESIRED_LANGUAGES: ["Kotlin"],
+        },
+        index=[14],
+    )
+    df_new = versioned(pd.concat([df, df_tail]), "test2")
+    languages.language_matrices(df)
+
+    languages._fold_new_rows(df, df_tail, df_new)
+    used, desired, names = languages.language_matrices(df_new)
+
+    assert list(names) == ["C", "Go", "Kotlin", "Python", "Rust"]
+    assert used.shape == desired.shape == (5, 5)
+
+    # Folded matrices match the ones built from scratch
+    df_scratch = df_new.copy()
+    df_scratch.attrs.clear()
+    pd.testing.assert_frame_equal(
+        languages.language_migration(df_new),
+        languages.language_migration(df_scratch),
+    )
+    assert languages.language_migration(df_new).loc["Python", "Kotlin"] == 1
@@ -0,0 +1,28 @@
+from config import settings
+
+from streamlit_stackoverflow import data_handling, multi_dimensional_analysis
+
+
+def test_python_sections_keep_data(write_data, monkeypatch):
+    monkeypatch.setattr(settings, "stats_resamples", 50)
+    monkeypatch.setattr(settings, "stats_permutations", 50)
+    write_data(
+        [
+            ("Brazil", "Python", 10),
+            ("Brazil", "Go", 30),
+            ("India", "Python", 20),
+        ]
+    )
+    df = data_handling.load_data()
+    columns = list(df.columns)
+
+    multi_dimensional_analysis._python_salary_global(df)
+    multi_dimensional_analysis._python_salary_brazil(df)
+
+    # The frame is shared by all sessions, so sections must not write to it
+    assert list(df.columns) == columns
+
+    write_data([("Chile", "Python", 40)], mode="a")
+    df_new = data_handling.load_data()
+    assert settings.USE_PYTHON not in df_new
+    assert data_handling.uses_python(df_new).sum() == 3
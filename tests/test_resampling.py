@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+from config import settings
+
+from streamlit_stackoverflow import resampling
+
+
+def _make_data(shift: float = 0.0) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            settings.COUNTRY: ["A"] * 300 + ["B"] * 200,
+            settings.YEARLY_SALARY: np.concatenate(
+                [rng.normal(100, 10, 300), rng.normal(100 + shift, 10, 200)]
+            ),
+        }
+    )
+
+
+def test_bootstrap_median_ci():
+    df = _make_data()
+    df.loc[0, settings.YEARLY_SALARY] = np.nan
+
+    df_ci = resampling.bootstrap_median_ci(
+        df, by=settings.COUNTRY, resamples=500
+    )
+
+    assert list(df_ci.index) == ["A", "B"]
+    assert list(df_ci["n"]) == [299, 200]
+    assert (df_ci["ci_low"] <= df_ci["median"]).all()
+    assert (df_ci["median"] <= df_ci["ci_high"]).all()
+
+
+def test_bootstrap_median_ci_is_reproducible():
+    df = _make_data()
+
+    df_ci = resampling.bootstrap_median_ci(
+        df, by=settings.COUNTRY, resamples=200, seed=1
+    )
+    df_ci2 = resampling.bootstrap_median_ci(
+        df, by=settings.COUNTRY, resamples=200, seed=1, workers=2
+    )
+
+    pd.testing.assert_frame_equal(df_ci, df_ci2)
+
+
+def test_permutation_test_medians():
+    p_value = resampling.permutation_test_medians(
+        _make_data(shift=20), by=settings.COUNTRY, permutations=200
+    )
+    assert p_value < 0.01
+
+    p_value = resampling.permutation_test_medians(
+        _make_data(), by=settings.COUNTRY, permutations=200
+    )
+    assert p_value > 0.05
+
+
+def test_compare_salary_medians_cache(versioned):
+    df = versioned(_make_data())
+
+    result = resampling.compare_salary_medians(df, by=settings.COUNTRY)
+    result2 = resampling.compare_salary_medians(df, by=settings.COUNTRY)
+    assert result is result2
+
+    # A subset of the same dataset must not reuse the cached result
+    result3 = resampling.compare_salary_medians(df[:400], by=settings.COUNTRY)
+    assert result3 is not result
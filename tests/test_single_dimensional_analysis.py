@@ -0,0 +1,57 @@
+import pandas as pd
+from config import settings
+
+from streamlit_stackoverflow import data_handling
+from streamlit_stackoverflow.single_dimensional_analysis import (
+    group_sizes, top_k
+)
+
+
+def test_top_k():
+    df_group = pd.Series([1, 2, 3, 4, 10], index=list("abcde"))
+
+    df_top = top_k(df_group, 2)
+
+    assert list(df_top.index) == [settings.other_label, "d", "e"]
+    assert list(df_top.values) == [6, 4, 10]
+    assert df_top.sum() == df_group.sum()
+
+
+def test_top_k_keeps_everything():
+    df_group = pd.Series([1, 2, 3], index=list("abc"))
+
+    assert top_k(df_group, None) is df_group
+    assert top_k(df_group, 3) is df_group
+
+
+def test_top_k_with_non_string_labels():
+    df_group = pd.Series([1, 2, 3], index=[10, 20, 30])
+
+    df_top = top_k(df_group, 1)
+
+    assert list(df_top.index) == [settings.other_label, "30"]
+
+
+def test_group_sizes_folded_on_refresh(write_data):
+    write_data(
+        [
+            ("Brazil", "Python", 10, "18-24"),
+            ("India", "C", None, "25-34"),
+            ("India", "Go", 30, "25-34"),
+        ]
+    )
+    df = data_handling.load_data()
+    group_sizes(df, by=settings.COUNTRY)
+    group_sizes(data_handling.salary_rows(df), by=settings.AGE)
+
+    write_data([("Chile", "Python", 40, "18-24")], mode="a")
+    df_new = data_handling.load_data()
+
+    # Folded sizes are cached for the new version and match a recount
+    for df_rows, by in (
+        (df_new, settings.COUNTRY),
+        (data_handling.salary_rows(df_new), settings.AGE),
+    ):
+        folded = group_sizes.peek(df_rows, by=by)
+        expected = df_rows.groupby(by=by).size().sort_values()
+        pd.testing.assert_series_equal(folded, expected)
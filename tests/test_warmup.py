@@ -0,0 +1,39 @@
+import pytest
+from config import settings
+
+from streamlit_stackoverflow import data_handling, warmup
+from streamlit_stackoverflow.resampling import compare_salary_medians
+from streamlit_stackoverflow.single_dimensional_analysis import group_sizes
+
+
+@pytest.fixture
+def data_file(write_data, monkeypatch):
+    full_time = settings.EMPLOYED_FULL_TIME
+    path = write_data(
+        [
+            ("Brazil", "Python", 10, "18-24", "Master", full_time),
+            ("Brazil", "Go", 30, "25-34", "Bachelor", full_time),
+            ("India", "Python", 20, "25-34", "Master", "Student"),
+            ("India", "C", None, "35-44", "Bachelor", "Student"),
+        ]
+    )
+    monkeypatch.setattr(settings, "stats_resamples", 50)
+    monkeypatch.setattr(settings, "stats_permutations", 50)
+    return path
+
+
+@pytest.mark.parametrize("workers", [0, 1])
+def test_warm_up(data_file, workers):
+    timings = warmup.warm_up(workers=workers)
+
+    assert "load data" in timings
+    assert all(time >= 0 for time in timings.values())
+
+    # The sections now hit the cache
+    df = data_handling.load_data()
+    df_salary = df[~df[settings.YEARLY_SALARY].isna()]
+    assert group_sizes.peek(df, by=settings.COUNTRY) is not None
+    assert group_sizes.peek(df_salary, by=settings.AGE) is not None
+    assert compare_salary_medians.peek(
+        df_salary, by=settings.ED_LEVEL
+    ) is not None